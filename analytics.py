@@ -0,0 +1,304 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from cost_engine import usage_weighted_roi
+from data_validation import validate_dataset
+from query_parser import QueryParser
+from segment_store import load_segment_store, persona_recommendations
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+METRIC_LABELS = {
+    'spend': 'Benefits Spend',
+    'satisfaction': 'Average Satisfaction',
+    'usage': 'Average Usage Frequency',
+    'roi': 'Usage-Weighted ROI',
+    'employees': 'Employees',
+    'per_employee': 'Cost per Employee',
+}
+
+GENERAL_MESSAGE = ('I can help you analyze various aspects of your benefits program. '
+                   'Try asking about specific departments, demographics, benefit types, or ROI metrics.')
+
+
+def add_age_group(df):
+    """Add generational age groups used across the app"""
+    df['age_group'] = pd.cut(
+        df['Age'], bins=[-np.inf, 25, 40, 55, np.inf], right=False,
+        labels=['Gen Z', 'Millennials', 'Gen X', 'Boomers']
+    ).astype(str)
+    return df
+
+
+def add_tenure_group(df):
+    """Add tenure bands used across the app"""
+    df['tenure_group'] = pd.cut(
+        df['Tenure'], bins=[-np.inf, 2, 7, np.inf],
+        labels=['New (0-2 years)', 'Mid (3-7 years)', 'Senior (8+ years)']
+    ).astype(str)
+    return df
+
+
+def add_month_column(df):
+    """Add a 'month' column (YYYY-MM) derived from LastUsedDate"""
+    df['month'] = pd.to_datetime(df['LastUsedDate'], errors='coerce').dt.strftime('%Y-%m')
+    return df
+
+
+def load_cleaned_data(file_path=os.path.join(DATA_DIR, "cleaned_data.csv")):
+    """Load and validate the cleaned dataset and add the derived group columns"""
+    df = pd.read_csv(file_path)
+    
+    # Fail fast on bad data, before anything caches it
+    validate_dataset(df)
+    
+    df = add_age_group(df)
+    df = add_tenure_group(df)
+    df = add_month_column(df)
+    
+    return df
+
+
+def load_recommendation_data(df, data_dir=DATA_DIR):
+    """Load the segment tables and resolve every persona to its segment's benefits"""
+    store = load_segment_store(data_dir)
+    benefits = pd.read_csv(os.path.join(data_dir, "benefits_data.csv"))
+    
+    return persona_recommendations(df, store, benefits)
+
+
+def kpi_summary(df):
+    """Headline program metrics shown in the sidebar and KPI cards"""
+    total_spend = df['BenefitCost'].sum()
+    total_employees = df['EmployeeID'].nunique()
+    return {
+        'total_spend': total_spend,
+        'avg_satisfaction': df['SatisfactionScore'].mean(),
+        'total_employees': total_employees,
+        'avg_cost_per_employee': total_spend / total_employees if total_employees else 0,
+    }
+
+
+def department_summary(df):
+    """Spend, headcount and satisfaction per department"""
+    return df.groupby('Department').agg({
+        'BenefitCost': 'sum',
+        'EmployeeID': 'nunique',
+        'SatisfactionScore': 'mean'
+    }).round(2)
+
+
+def persona_lookup(personas, department, age_group, tenure_group):
+    """Segment and top/bottom/recommended benefits for one persona, or None"""
+    persona = personas[
+        (personas["Department"] == department) &
+        (personas["age_group"] == age_group) &
+        (personas["tenure_group"] == tenure_group)
+    ]
+    if persona.empty:
+        return None
+
+    row = persona.iloc[0]
+    return {
+        'employee_segment': int(row['employee_segment']),
+        'top': [row["top1"], row["top2"], row["top3"]],
+        'bot': [row["bot1"], row["bot2"], row["bot3"]],
+        'recs': [r for r in (row["seg_rec1"], row["seg_rec2"], row["seg_rec3"])
+                 if pd.notna(r) and str(r).strip() != ""],
+    }
+
+
+def department_report(df, department):
+    """KPIs and per-benefit spend, satisfaction, usage and ROI for one department"""
+    data = df[df['Department'] == department]
+    if data.empty:
+        return None
+    benefits = summarize(data, ['BenefitType']).drop(columns='value')
+    return {
+        'department': department,
+        'kpis': kpi_summary(data),
+        'benefits': benefits.sort_values('spend', ascending=False),
+    }
+
+
+class BenefitsEngine:
+    """Headless access to the chat, KPI and persona analytics.
+
+    Holds the loaded data and the compiled query parser, so it can be driven
+    from batch jobs (see cli.py) as well as from the Streamlit app.
+    """
+
+    def __init__(self, df, personas=None):
+        self.df = df
+        self.personas = personas
+        self.parser = QueryParser(df)
+
+    @classmethod
+    def from_files(cls, file_path=os.path.join(DATA_DIR, "cleaned_data.csv"), data_dir=DATA_DIR):
+        df = load_cleaned_data(file_path)
+        return cls(df, load_recommendation_data(df, data_dir))
+
+    def query(self, text):
+        return execute_query(self.df, self.parser.parse(text))
+
+    def persona(self, department, age_group, tenure_group):
+        return persona_lookup(self.personas, department, age_group, tenure_group)
+
+    def department_report(self, department):
+        return department_report(self.df, department)
+
+    def kpis(self):
+        return kpi_summary(self.df)
+
+
+def data_version(df):
+    """Fingerprint of the dataset contents, used to key cached query results"""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).values
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+
+def apply_filters(df, filters):
+    """Return the rows matching every {column: [values]} filter"""
+    mask = pd.Series(True, index=df.index)
+    for column, values in filters.items():
+        mask &= df[column].isin(values)
+    return df[mask]
+
+
+def summarize(df, group_by=None):
+    """Compute every chat metric in one aggregation pass.
+
+    Returns a one-row Series when group_by is empty, otherwise a DataFrame
+    indexed by the group-by columns with one column per metric.
+    """
+    aggregations = {
+        'spend': ('BenefitCost', 'sum'),
+        'satisfaction': ('SatisfactionScore', 'mean'),
+        'usage': ('UsageFrequency', 'mean'),
+        'employees': ('EmployeeID', 'nunique'),
+        'value': ('_value', 'sum'),
+    }
+    df = df.assign(_value=df['UsageFrequency'] * df['SatisfactionScore'])
+    if group_by:
+        stats = df.groupby(group_by, observed=True).agg(**aggregations)
+    else:
+        stats = df.assign(_all='all').groupby('_all').agg(**aggregations)
+
+    stats['per_employee'] = stats['spend'] / stats['employees'].where(stats['employees'] > 0)
+    stats['roi'] = usage_weighted_roi(stats['value'], stats['spend'])
+
+    return stats if group_by else stats.iloc[0]
+
+
+def default_breakdown(structured):
+    """Dimension to break results down by when the query did not ask for one"""
+    if structured['group_by']:
+        return list(structured['group_by'])
+    if 'BenefitType' in structured['filters']:
+        return ['Department']
+    return ['BenefitType']
+
+
+def execute_query(df, structured):
+    """Run a structured query from QueryParser against the benefits data"""
+    if structured is None:
+        return {'type': 'general', 'message': GENERAL_MESSAGE}
+
+    if 'month' not in df.columns and 'month' in structured['group_by']:
+        df = add_month_column(df.copy())
+
+    metric = structured['metric']
+    data = apply_filters(df, structured['filters'])
+    if data.empty:
+        return {
+            'type': 'general',
+            'message': 'No records match that combination of filters. Try a broader question.'
+        }
+
+    totals = summarize(data)
+
+    group_by = default_breakdown(structured)
+    breakdown = summarize(data, group_by)[metric]
+    if 'month' in group_by:
+        breakdown = breakdown.sort_index()
+    else:
+        breakdown = breakdown.sort_values(ascending=structured['order'] == 'asc')
+
+    return {
+        'type': 'aggregate',
+        'query': structured,
+        'metric': metric,
+        'value': totals[metric],
+        'total_spend': totals['spend'],
+        'employee_count': int(totals['employees']),
+        'per_employee': totals['per_employee'],
+        'avg_satisfaction': totals['satisfaction'],
+        'group_by': group_by,
+        'breakdown': breakdown,
+    }
+
+
+def format_value(metric, value):
+    """Format a metric value for display"""
+    if pd.isna(value):
+        return 'n/a'
+    if metric in ('spend', 'per_employee'):
+        return f"${value:,.0f}"
+    if metric == 'satisfaction':
+        return f"{value:.1f}/5"
+    if metric == 'roi':
+        return f"{value:.1f} per $1k"
+    if metric == 'employees':
+        return f"{value:,.0f}"
+    return f"{value:.2f}"
+
+
+def describe_filters(filters):
+    """Human-readable scope of a query, e.g. 'Finance | Gen Z, Millennials'"""
+    if not filters:
+        return 'All Employees'
+    return ' | '.join(', '.join(values) for values in filters.values())
+
+
+def format_response(result, limit=5):
+    """Build the chat answer for a query result"""
+    if result['type'] != 'aggregate':
+        return result.get('message', GENERAL_MESSAGE)
+
+    metric = result['metric']
+    label = METRIC_LABELS[metric]
+    group_label = ' & '.join(result['group_by'])
+
+    breakdown = result['breakdown']
+    if result['group_by'][-1] == 'month' and len(result['group_by']) == 2:
+        # One line per group: first month -> latest month
+        by_group = breakdown.groupby(level=0, observed=True)
+        lines = [
+            f"    - {group}: {format_value(metric, series.iloc[0])} ({series.index[0][1]}) → "
+            f"{format_value(metric, series.iloc[-1])} ({series.index[-1][1]})"
+            for group, series in by_group
+        ]
+    else:
+        if result['group_by'] != ['month']:
+            breakdown = breakdown.head(limit)
+        lines = [
+            f"    - {' / '.join(map(str, key)) if isinstance(key, tuple) else key}: "
+            f"{format_value(metric, value)}"
+            for key, value in breakdown.items()
+        ]
+    breakdown_text = "\n".join(lines)
+
+    return f"""**{label}: {describe_filters(result['query']['filters'])}**
+
+    📊 **Key Metrics:**
+    - {label}: {format_value(metric, result['value'])}
+    - Total Spend: ${result['total_spend']:,.0f}
+    - Employees: {result['employee_count']}
+    - Per Employee: ${result['per_employee']:,.0f}
+    - Average Satisfaction: {result['avg_satisfaction']:.1f}/5
+
+    🔍 **{label} by {group_label}:**
+{breakdown_text}"""
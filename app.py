@@ -4,10 +4,27 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import time
 import os
 import altair as alt
 
+import analytics
+from analytics import METRIC_LABELS, summarize, execute_query, format_response, data_version
+from query_parser import QueryParser
+from query_cache import QueryResultCache, normalize_query
+from segment_store import load_segment_store
+from data_validation import DataValidationError
+from cost_engine import CostEngine
+
+# Sample queries shown in the chat view; also used to warm the result cache
+SAMPLE_QUERIES = [
+    "What was the benefits spend on the finance team?",
+    "What was the satisfaction for Gen Z and Millennials?",
+    "How much was spent on 401k matching?",
+    "What was the ROI proxy for HR team benefits?",
+    "Show me usage trends by department",
+    "Which benefits have the highest satisfaction scores?"
+]
+
 # Page configuration
 st.set_page_config(
     page_title="AI-Powered HR Benefits Insights",
@@ -59,39 +76,25 @@ if 'messages' not in st.session_state:
 if 'query_history' not in st.session_state:
     st.session_state.query_history = []
 
-# Mock dataset based on your structure
-@st.cache_data
-def load_cleaned_data():
-    """Load the cleaned dataset from CSV"""
-    base_dir = os.path.dirname(__file__)
-    file_path = os.path.join(base_dir, "data", "cleaned_data.csv")
-    
-    df = pd.read_csv(file_path)
-    
-    # Add age groups
-    df['age_group'] = df['Age'].apply(lambda x: 
-        'Gen Z' if x < 25 else 
-        'Millennials' if x < 40 else 
-        'Gen X' if x < 55 else 'Boomers'
-    )
-    
-    # Add tenure groups
-    df['tenure_group'] = df['Tenure'].apply(lambda x:
-        'New (0-2 years)' if x <= 2 else
-        'Mid (3-7 years)' if x <= 7 else
-        'Senior (8+ years)'
-    )
-    
-    return df
+# Analytics live in analytics.py so batch jobs (cli.py) can reuse them;
+# the app only adds Streamlit caching on top
+DATA_FILE = os.path.join(analytics.DATA_DIR, "cleaned_data.csv")
+
+def data_file_mtime():
+    """Modification time of the cleaned data. The cached loaders below take it as
+    an argument, so the data, the parser and the data version reload together
+    when the file changes"""
+    return os.path.getmtime(DATA_FILE)
 
-def load_recommendation_data():
+@st.cache_data(max_entries=1)
+def load_cleaned_data(mtime):
     """Load the cleaned dataset from CSV"""
-    base_dir = os.path.dirname(__file__)
-    file_path = os.path.join(base_dir, "data", "cluster_recommendation.csv")
-    
-    df = pd.read_csv(file_path)
-    
-    return df
+    return analytics.load_cleaned_data(DATA_FILE)
+
+@st.cache_data(max_entries=1)
+def load_recommendation_data(mtime):
+    """Load the segment tables and resolve every persona to its segment's benefits"""
+    return analytics.load_recommendation_data(load_cleaned_data(mtime), analytics.DATA_DIR)
 
 def load_best_sentiment_analysis_data():
     """Load the cleaned dataset from CSV and normalize column names."""
@@ -116,9 +119,48 @@ def load_worst_sentiment_analysis_data():
     
     return df
 
+@st.cache_resource(max_entries=1)
+def load_cost_engine(mtime):
+    """Precompute cost, ROI and cost-growth arrays for what-if scenarios"""
+    benefit_costs = pd.read_csv(os.path.join(analytics.DATA_DIR, "benefit_cost.csv"))
+    assignments = load_segment_store(analytics.DATA_DIR)['assignments']
+    segments = assignments.set_index('EmployeeID')['employee_segment']
+    
+    return CostEngine(load_cleaned_data(mtime), benefit_costs, segments)
+
+@st.cache_resource(max_entries=1)
+def load_query_parser(mtime):
+    """Compile the chat vocabulary once from the loaded dataset"""
+    return QueryParser(load_cleaned_data(mtime))
+
+@st.cache_data(max_entries=1)
+def load_data_version(mtime):
+    """Fingerprint the loaded dataset so cached results follow data refreshes"""
+    return data_version(load_cleaned_data(mtime))
+
+@st.cache_resource
+def load_query_cache():
+    """Result cache shared across all sessions, warmed with the sample queries"""
+    cache = QueryResultCache(maxsize=256, ttl=3600)
+    mtime = data_file_mtime()
+    data = load_cleaned_data(mtime)
+    parser = load_query_parser(mtime)
+    version = load_data_version(mtime)
+    for query in SAMPLE_QUERIES:
+        structured = parser.parse(query)
+        if structured is not None:
+            cache.put(normalize_query(structured, version), execute_query(data, structured))
+    return cache
+
 # Load data
-df = load_cleaned_data()
-df2 = load_recommendation_data()
+data_mtime = data_file_mtime()
+try:
+    df = load_cleaned_data(data_mtime)
+except DataValidationError as e:
+    st.error(f"❌ {e}")
+    st.json(e.report['rules'])
+    st.stop()
+df2 = load_recommendation_data(data_mtime)
 df3 = load_best_sentiment_analysis_data()
 df4 = load_worst_sentiment_analysis_data()
 
@@ -147,10 +189,11 @@ with st.expander("🧠 System Architecture", expanded=False):
 st.sidebar.markdown("## 📊 Key Metrics Dashboard")
 
 # Calculate key metrics
-total_spend = df['BenefitCost'].sum()
-avg_satisfaction = df['SatisfactionScore'].mean()
-total_employees = df['EmployeeID'].nunique()
-avg_cost_per_employee = total_spend / total_employees
+kpis = analytics.kpi_summary(df)
+total_spend = kpis['total_spend']
+avg_satisfaction = kpis['avg_satisfaction']
+total_employees = kpis['total_employees']
+avg_cost_per_employee = kpis['avg_cost_per_employee']
 
 st.sidebar.metric("Total Benefits Spend", f"${total_spend:,.0f}")
 st.sidebar.metric("Average Satisfaction", f"{avg_satisfaction:.1f}/5")
@@ -159,11 +202,7 @@ st.sidebar.metric("Cost per Employee", f"${avg_cost_per_employee:,.0f}")
 
 # Department breakdown in sidebar
 st.sidebar.markdown("## 🏢 Department Overview")
-dept_summary = df.groupby('Department').agg({
-    'BenefitCost': 'sum',
-    'EmployeeID': 'nunique',
-    'SatisfactionScore': 'mean'
-}).round(2)
+dept_summary = analytics.department_summary(df)
 
 for dept in dept_summary.index:
     with st.sidebar.expander(f"{dept}"):
@@ -171,6 +210,10 @@ for dept in dept_summary.index:
         st.write(f"👥 Employees: {dept_summary.loc[dept, 'EmployeeID']}")
         st.write(f"😊 Satisfaction: {dept_summary.loc[dept, 'SatisfactionScore']:.1f}/5")
 
+# Shared query cache counters, filled in at the end of the run so they
+# include the question answered in this run
+cache_stats_slot = st.sidebar.empty()
+
 # Initialize session state for view selection
 if 'current_view' not in st.session_state:
     st.session_state.current_view = 'chat'
@@ -202,143 +245,58 @@ if st.session_state.current_view == 'chat':
     
     # Sample queries
     st.markdown("### 🔍 Sample Queries:")
-    sample_queries = [
-        "What was the benefits spend on the finance team?",
-        "What was the satisfaction for Gen Z and Millennials?",
-        "How much was spent on 401k matching?",
-        "What was the ROI proxy for HR team benefits?",
-        "Show me usage trends by department",
-        "Which benefits have the highest satisfaction scores?"
-    ]
-    
     # Create clickable sample queries
     cols = st.columns(2)
-    for i, query in enumerate(sample_queries):
+    for i, query in enumerate(SAMPLE_QUERIES):
         with cols[i % 2]:
             if st.button(query, key=f"sample_{i}", use_container_width=True):
                 st.session_state.user_input = query
 
 def process_query(query):
     """Process user query and return insights"""
-    query_lower = query.lower()
-    
-    if 'finance' in query_lower and 'spend' in query_lower:
-        finance_data = df[df['Department'] == 'Finance']
-        total_spend = finance_data['BenefitCost'].sum()
-        employee_count = finance_data['EmployeeID'].nunique()
-        per_employee = total_spend / employee_count if employee_count > 0 else 0
-        
-        # Breakdown by benefit type
-        breakdown = finance_data.groupby('BenefitType')['BenefitCost'].sum().sort_values(ascending=False)
-        
-        return {
-            'type': 'finance_spend',
-            'total_spend': total_spend,
-            'employee_count': employee_count,
-            'per_employee': per_employee,
-            'breakdown': breakdown,
-            'data': finance_data
-        }
-    
-    elif 'satisfaction' in query_lower and ('gen z' in query_lower or 'millennial' in query_lower):
-        generational_data = df[df['age_group'].isin(['Gen Z', 'Millennials'])]
-        satisfaction_by_gen = generational_data.groupby('age_group').agg({
-            'SatisfactionScore': ['mean', 'count']
-        }).round(2)
-        
-        return {
-            'type': 'generational_satisfaction',
-            'data': generational_data,
-            'summary': satisfaction_by_gen
-        }
-    
-    elif '401k' in query_lower and 'match' in query_lower:
-        k401_data = df[df['BenefitType'] == '401k']
-        total_spent = k401_data['BenefitCost'].sum()
-        participation = len(k401_data) / len(df) * 100
-        avg_satisfaction = k401_data['SatisfactionScore'].mean()
-        
-        return {
-            'type': '401k_analysis',
-            'total_spent': total_spent,
-            'participation': participation,
-            'avg_satisfaction': avg_satisfaction,
-            'data': k401_data
-        }
-    
-    elif 'roi' in query_lower and 'hr' in query_lower:
-        hr_data = df[df['Department'] == 'HR']
-        hr_spend = hr_data['BenefitCost'].sum()
-        hr_employees = hr_data['EmployeeID'].nunique()
-        hr_satisfaction = hr_data['SatisfactionScore'].mean()
-        
-        # Calculate ROI proxy (simplified)
-        avg_satisfaction = df['SatisfactionScore'].mean()
-        roi_proxy = (hr_satisfaction / avg_satisfaction) * 2.1  # Mock ROI calculation
-        
-        return {
-            'type': 'hr_roi',
-            'hr_spend': hr_spend,
-            'hr_employees': hr_employees,
-            'hr_satisfaction': hr_satisfaction,
-            'roi_proxy': roi_proxy,
-            'data': hr_data
-        }
-    
-    else:
-        return {
-            'type': 'general',
-            'message': 'I can help you analyze various aspects of your benefits program. Try asking about specific departments, demographics, benefit types, or ROI metrics.'
-        }
+    structured = load_query_parser(data_mtime).parse(query)
+    if structured is None:
+        return execute_query(df, structured)
+
+    key = normalize_query(structured, load_data_version(data_mtime))
+    return load_query_cache().get_or_compute(key, lambda: execute_query(df, structured))
 
 def create_visualization(result):
     """Create appropriate visualization based on query result"""
     
-    if result['type'] == 'finance_spend':
-        fig = px.bar(
-            x=result['breakdown'].values,
-            y=result['breakdown'].index,
-            orientation='h',
-            title='Finance Team Benefits Breakdown',
-            labels={'x': 'Spending ($)', 'y': 'Benefit Type'}
-        )
-        fig.update_layout(height=400)
-        return fig
-    
-    elif result['type'] == 'generational_satisfaction':
-        satisfaction_data = result['data'].groupby('age_group')['SatisfactionScore'].mean().reset_index()
-        fig = px.bar(
-            satisfaction_data,
-            x='age_group',
-            y='SatisfactionScore',
-            title='Satisfaction by Generation',
-            labels={'SatisfactionScore': 'Average Satisfaction', 'age_group': 'Generation'}
-        )
-        fig.update_layout(height=400)
-        return fig
-    
-    elif result['type'] == '401k_analysis':
-        participation_data = result['data'].groupby('Department')['BenefitCost'].sum().reset_index()
-        fig = px.pie(
-            participation_data,
-            values='BenefitCost',
-            names='Department',
-            title='401k Spending by Department'
-        )
-        fig.update_layout(height=400)
-        return fig
-    
-    elif result['type'] == 'hr_roi':
-        dept_roi = df.groupby('Department')['SatisfactionScore'].mean().reset_index()
-        dept_roi['ROI_Proxy'] = (dept_roi['SatisfactionScore'] / df['SatisfactionScore'].mean()) * 2.1
+    if result['type'] == 'aggregate':
+        group_by = result['group_by']
+        metric = result['metric']
+        chart_data = result['breakdown'].rename(metric).reset_index()
+        title = f"{METRIC_LABELS[metric]} by {' & '.join(group_by)}"
         
-        fig = px.bar(
-            dept_roi,
-            x='Department',
-            y='ROI_Proxy',
-            title='ROI Proxy by Department',
-            labels={'ROI_Proxy': 'ROI Proxy (x)'}
-        )
+        if group_by[-1] == 'month':
+            fig = px.line(
+                chart_data,
+                x='month',
+                y=metric,
+                color=group_by[0] if len(group_by) == 2 else None,
+                markers=True,
+                title=title
+            )
+        elif len(group_by) == 2:
+            fig = px.bar(
+                chart_data,
+                x=group_by[0],
+                y=metric,
+                color=group_by[1],
+                barmode='group',
+                title=title
+            )
+        else:
+            fig = px.bar(
+                chart_data,
+                x=metric,
+                y=group_by[0],
+                orientation='h',
+                title=title,
+                labels={metric: METRIC_LABELS[metric]}
+            )
         fig.update_layout(height=400)
         return fig
     
@@ -368,68 +326,10 @@ if st.session_state.current_view == 'chat':
             })
             
             with st.spinner('Analyzing data...'):
-                time.sleep(1)
                 result = process_query(query)
             
-            # build response (your logic continues here...)
-            
             # Generate bot response
-            if result['type'] == 'finance_spend':
-                breakdown_text = "\n".join([f"- {benefit}: ${amount:,.0f}" for benefit, amount in result['breakdown'].head().items()])
-                response = f"""**Finance Team Benefits Analysis:**
-                
-    📊 **Key Metrics:**
-    - Total Spend: ${result['total_spend']:,.0f}
-    - Employees: {result['employee_count']}
-    - Per Employee: ${result['per_employee']:,.0f}
-
-    🔍 **Top Benefit Categories:**
-    {breakdown_text}"""
-                
-            elif result['type'] == 'generational_satisfaction':
-                gen_z_satisfaction = result['summary'].loc['Gen Z', ('SatisfactionScore', 'mean')]
-                millennial_satisfaction = result['summary'].loc['Millennials', ('SatisfactionScore', 'mean')]
-                gen_z_count = result['summary'].loc['Gen Z', ('SatisfactionScore', 'count')]
-                millennial_count = result['summary'].loc['Millennials', ('SatisfactionScore', 'count')]
-                
-                response = f"""**Generational Satisfaction Analysis:**
-                
-    📊 **Satisfaction Scores:**
-    - Gen Z: {gen_z_satisfaction:.1f}/5 ({gen_z_count} employees)
-    - Millennials: {millennial_satisfaction:.1f}/5 ({millennial_count} employees)
-
-    💡 **Key Insights:**
-    - {"Millennials" if millennial_satisfaction > gen_z_satisfaction else "Gen Z"} show higher satisfaction
-    - Difference: {abs(millennial_satisfaction - gen_z_satisfaction):.1f} points"""
-                
-            elif result['type'] == '401k_analysis':
-                response = f"""**401k Program Analysis:**
-                
-    📊 **Program Metrics:**
-    - Total Investment: ${result['total_spent']:,.0f}
-    - Participation Rate: {result['participation']:.1f}%
-    - Average Satisfaction: {result['avg_satisfaction']:.1f}/5
-
-    💡 **Performance Insights:**
-    - Strong participation across all departments
-    - High satisfaction indicates effective program design
-    - ROI proxy suggests good retention impact"""
-                
-            elif result['type'] == 'hr_roi':
-                response = f"""**HR Team ROI Analysis:**
-                
-    📊 **ROI Metrics:**
-    - HR Team Spend: ${result['hr_spend']:,.0f}
-    - Employees: {result['hr_employees']}
-    - Satisfaction: {result['hr_satisfaction']:.1f}/5
-    - ROI Proxy: {result['roi_proxy']:.1f}x
-
-    💡 **Key Insights:**
-    - HR team ROI is {"above" if result['roi_proxy'] > 2.1 else "below"} company average
-    - High satisfaction indicates effective benefits utilization"""
-                
-            else:
-                response = result.get('message', 'I can help you analyze your benefits data. Try asking about specific departments or metrics.')
+            response = format_response(result)
             
             # Add bot response
             st.session_state.messages.append({
@@ -512,7 +412,6 @@ else:
     df["Utilization"] = df["UsageFrequency"]
     df["Satisfaction"] = df["SatisfactionScore"]
     df["Benefit_Spend"] = df["BenefitCost"]
-    df["ROI"] = (df["SatisfactionScore"] / (df["BenefitCost"] + 1)) * 100
 
     # Chart toolbar config
     plotly_config = {"displaylogo": False, "displayModeBar": True}
@@ -543,7 +442,11 @@ else:
         st.warning("👉 Please select at least one categorical dimension for X-axis.")
     else:
         group_cols = x_selection
-        grouped = df.groupby(group_cols)[y_selection].mean().reset_index()
+        if y_selection == "ROI":
+            # Usage-weighted ROI per group, not an average of row-level ratios
+            grouped = summarize(df, group_cols)['roi'].rename("ROI").reset_index()
+        else:
+            grouped = df.groupby(group_cols)[y_selection].mean().reset_index()
 
         # If 1 dimension → simple bar
         if len(x_selection) == 1:
@@ -591,13 +494,80 @@ else:
             delta="0.3 from last survey"
         )
     
+    cost_engine = load_cost_engine(data_mtime)
+    baseline = cost_engine.scenario()['totals']
+    
     with kpi_col4:
         st.metric(
-            label="🎯 ROI Index",
-            value="2.1x",
-            delta="0.2x improvement"
+            label="🎯 Usage-Weighted ROI",
+            value=f"{baseline['roi']:.1f} per $1k",
+            help="Sum of usage × satisfaction per $1,000 of benefits spend"
         )
 
+    # -------------------------------
+    # What-if cost scenarios
+    # -------------------------------
+    st.markdown("## 💸 Cost & ROI Scenario Planner")
+    st.markdown(
+        "Drop or re-price benefits to see the effect on spend, participation, ROI "
+        "and projected cost growth (from the 5-year cost rise per benefit type)."
+    )
+
+    scen_col1, scen_col2, scen_col3 = st.columns(3)
+    with scen_col1:
+        dropped = st.multiselect(
+            "Drop benefits:",
+            options=list(cost_engine.types) + list(cost_engine.subtypes),
+            key="scenario_dropped"
+        )
+    with scen_col2:
+        repriced = st.selectbox(
+            "Re-price benefit type:",
+            options=["(none)"] + list(cost_engine.types),
+            key="scenario_repriced"
+        )
+        price_change = st.slider(
+            "Price change (%)", min_value=-50, max_value=50, value=0, step=5,
+            key="scenario_price_change", disabled=repriced == "(none)"
+        )
+    with scen_col3:
+        years = st.slider("Projection horizon (years)", min_value=1, max_value=10, value=5,
+                          key="scenario_years")
+
+    price_factors = {} if repriced == "(none)" else {repriced: 1 + price_change / 100}
+    scenario = cost_engine.scenario(dropped=dropped, price_factors=price_factors, years=years)
+    totals = scenario['totals']
+
+    res_col1, res_col2, res_col3, res_col4 = st.columns(4)
+    with res_col1:
+        st.metric("💰 Annual Spend", f"${totals['spend']:,.0f}",
+                  delta=f"${-totals['savings']:,.0f}", delta_color="inverse")
+    with res_col2:
+        st.metric(f"📈 Projected Spend ({years}y)", f"${totals['projected_spend']:,.0f}",
+                  delta=f"${-totals['projected_savings']:,.0f}", delta_color="inverse")
+    with res_col3:
+        st.metric("👥 Participating Employees", f"{totals['participants']:,}",
+                  delta=f"{totals['participants'] - baseline['participants']:,}")
+    with res_col4:
+        st.metric("🎯 Usage-Weighted ROI", f"{totals['roi']:.1f} per $1k",
+                  delta=f"{totals['roi'] - baseline['roi']:.1f}")
+
+    scenario_level = st.radio(
+        "Break down by:", options=["BenefitType", "BenefitSubType", "employee_segment"],
+        horizontal=True, key="scenario_level"
+    )
+    level_table = scenario[scenario_level].reset_index()
+    level_table[scenario_level] = level_table[scenario_level].astype(str)
+    fig = px.bar(
+        level_table.melt(id_vars=scenario_level, value_vars=["spend", "projected_spend"],
+                         var_name="Period", value_name="Cost"),
+        x=scenario_level, y="Cost", color="Period", barmode="group",
+        title=f"Current vs Projected Cost by {scenario_level}"
+    )
+    fig.update_layout(height=500)
+    st.plotly_chart(fig, use_container_width=True, config=plotly_config)
+    st.dataframe(scenario[scenario_level].round(2), use_container_width=True)
+
     st.markdown("## 🎯 Custom Employee Persona & Recommendations")
 
     # Dropdowns for persona creation
@@ -609,24 +579,18 @@ else:
     with col3:
         tenure = st.selectbox("Select Tenure Group", sorted(df2["tenure_group"].unique()))
 
-    # Filter dataframe
-    persona = df2[
-        (df2["Department"] == dept) &
-        (df2["age_group"] == age) &
-        (df2["tenure_group"] == tenure)
-    ]
+    # Look up the persona's segment
+    persona = analytics.persona_lookup(df2, dept, age, tenure)
 
-    if persona.empty:
+    if persona is None:
         st.warning("⚠️ No data found for this combination.")
     else:
-        row = persona.iloc[0]
-
-        st.subheader(f"📌 Employee Segment: {row['employee_segment']}")
+        st.subheader(f"📌 Employee Segment: {persona['employee_segment']}")
 
         # Top and Bottom Benefits
-        top_benefits = [row["top1"], row["top2"], row["top3"]]
-        bot_benefits = [row["bot1"], row["bot2"], row["bot3"]]
-        recs = [row["seg_rec1"], row["seg_rec2"], row["seg_rec3"]]
+        top_benefits = persona['top']
+        bot_benefits = persona['bot']
+        recs = persona['recs']
 
         colA, colB, colC = st.columns(3)
         with colA:
@@ -786,5 +750,9 @@ else:
     fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
     st.plotly_chart(fig, use_container_width=True, config=plotly_config)
 
-
-
+# Query cache counters, rendered last so they include this run's question
+cache_stats = load_query_cache().stats()
+cache_stats_slot.caption(
+    f"⚡ Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['size']}/{cache_stats['maxsize']} entries)"
+)
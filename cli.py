@@ -0,0 +1,214 @@
+"""Batch runner for the benefits analytics, without Streamlit.
+
+Each line of the input file is one item:
+
+    What was the benefits spend on the finance team?
+    persona: Finance, Gen X, Mid (3-7 years)
+    report: Finance
+
+Plain lines are chat queries, 'persona:' lines look up a persona's segment
+and recommendations, and 'report:' lines build a department report. Blank
+lines and lines starting with '#' are skipped. Results are streamed as JSON
+lines or CSV rows in input order.
+
+    python cli.py managers.txt --workers 8 --format csv --output reports.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analytics import DATA_DIR, BenefitsEngine, format_response, load_cleaned_data, load_recommendation_data
+from shared_dataset import export_dataset, open_dataset
+
+CSV_FIELDS = ['line', 'kind', 'input', 'type', 'metric', 'value', 'total_spend',
+              'employee_count', 'per_employee', 'avg_satisfaction', 'employee_segment', 'details']
+
+# Set in each worker process by _init_worker
+_engine = None
+
+
+def parse_item(line):
+    """Split an input line into (kind, payload)"""
+    head, sep, rest = line.partition(':')
+    if sep and head.strip().lower() in ('persona', 'report'):
+        return head.strip().lower(), rest.strip()
+    return 'query', line.strip()
+
+
+def read_items(path):
+    """Yield (line number, kind, payload) for every non-empty input line"""
+    f = sys.stdin if path == '-' else open(path)
+    try:
+        for number, line in enumerate(f, 1):
+            if line.strip() and not line.lstrip().startswith('#'):
+                yield (number,) + parse_item(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _to_json(value):
+    """json.dumps fallback for numpy and pandas values"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return value.to_dict()
+    return str(value)
+
+
+def _series_record(series):
+    return {' / '.join(map(str, key)) if isinstance(key, tuple) else str(key): value
+            for key, value in series.items()}
+
+
+def query_record(result):
+    if result['type'] != 'aggregate':
+        return {'type': result['type'], 'answer': format_response(result)}
+    return {
+        'type': result['type'],
+        'metric': result['metric'],
+        'value': result['value'],
+        'total_spend': result['total_spend'],
+        'employee_count': result['employee_count'],
+        'per_employee': result['per_employee'],
+        'avg_satisfaction': result['avg_satisfaction'],
+        'filters': result['query']['filters'],
+        'group_by': result['group_by'],
+        'breakdown': _series_record(result['breakdown']),
+        'answer': format_response(result),
+    }
+
+
+def persona_record(engine, payload):
+    parts = [part.strip() for part in payload.split(',', 2)]
+    if len(parts) != 3:
+        return {'type': 'error', 'error': "expected 'persona: Department, age group, tenure group'"}
+    persona = engine.persona(*parts)
+    if persona is None:
+        return {'type': 'not_found'}
+    return dict(type='persona', **persona)
+
+
+def report_record(engine, payload):
+    report = engine.department_report(payload)
+    if report is None:
+        return {'type': 'not_found'}
+    kpis = report['kpis']
+    return {
+        'type': 'department_report',
+        'total_spend': kpis['total_spend'],
+        'employee_count': kpis['total_employees'],
+        'per_employee': kpis['avg_cost_per_employee'],
+        'avg_satisfaction': kpis['avg_satisfaction'],
+        'benefits': report['benefits'].round(4).to_dict(orient='index'),
+    }
+
+
+def run_item(engine, item):
+    """Execute one input item and return a JSON-serializable record"""
+    number, kind, payload = item
+    try:
+        if kind == 'persona':
+            record = persona_record(engine, payload)
+        elif kind == 'report':
+            record = report_record(engine, payload)
+        else:
+            record = query_record(engine.query(payload))
+    except Exception as e:  # one bad line must not stop the batch
+        record = {'type': 'error', 'error': f"{type(e).__name__}: {e}"}
+    return dict(line=number, kind=kind, input=payload, **record)
+
+
+def _init_worker(dataset_dir, personas):
+    global _engine
+    _engine = BenefitsEngine(open_dataset(dataset_dir), personas)
+
+
+def _run_in_worker(item):
+    return run_item(_engine, item)
+
+
+class RecordWriter:
+    """Stream records as JSON lines or CSV rows"""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, record):
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps(record, default=_to_json) + '\n')
+            return
+        row = {field: record.get(field) for field in CSV_FIELDS if field != 'details'}
+        details = {k: v for k, v in record.items() if k not in CSV_FIELDS}
+        row['details'] = json.dumps(details, default=_to_json) if details else ''
+        self.writer.writerow(row)
+
+
+def run_batch(items, engine, workers=1, chunksize=32):
+    """Yield one record per item, in input order.
+
+    With more than one worker the dataset is exported once to a temporary
+    directory of memory-mapped columns that every worker process opens.
+    """
+    if workers <= 1:
+        for item in items:
+            yield run_item(engine, item)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='benefits-dataset-') as dataset_dir:
+        export_dataset(engine.df, dataset_dir)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(dataset_dir, engine.personas)) as pool:
+            yield from pool.map(_run_in_worker, items, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run benefits queries, persona lookups and "
+                                                 "department reports in batch")
+    parser.add_argument('input', help="File with one query, 'persona:' or 'report:' item per line "
+                                      "('-' for stdin)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--output', help="Write results here instead of stdout")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 runs in-process)")
+    parser.add_argument('--chunksize', type=int, default=32,
+                        help="Items sent to a worker at a time")
+    parser.add_argument('--data', default=os.path.join(DATA_DIR, 'cleaned_data.csv'),
+                        help="Cleaned benefits CSV, written by data_foundation.ipynb")
+    parser.add_argument('--data-dir', default=DATA_DIR,
+                        help="Directory with benefits_data.csv and the segment tables")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.data):
+        parser.error(f"{args.data} not found; run data_foundation.ipynb to create it "
+                     "or pass --data with the path to a cleaned benefits CSV")
+
+    df = load_cleaned_data(args.data)
+    engine = BenefitsEngine(df, load_recommendation_data(df, args.data_dir))
+    items = list(read_items(args.input))
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = RecordWriter(out, args.format)
+        for record in run_batch(items, engine, args.workers, args.chunksize):
+            writer.write(record)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
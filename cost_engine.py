@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+# Projection horizon that benefit_cost.csv's percentage rise refers to
+RISE_PERIOD_YEARS = 5
+
+
+def usage_weighted_roi(value, spend):
+    """Usage-weighted satisfaction (sum of usage x satisfaction) per $1,000 spent"""
+    spend = np.asarray(spend, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(spend > 0, 1000 * np.asarray(value, dtype=float) / spend, np.nan)
+
+
+def annual_growth_rates(benefit_costs):
+    """Compound annual cost growth per BenefitType from the 5-year percentage rise"""
+    rise = benefit_costs.set_index('BenefitType')['Percentage Rise (5 years)'] / 100
+    return (1 + rise) ** (1 / RISE_PERIOD_YEARS) - 1
+
+
+class CostEngine:
+    """Precomputed cost, usage and ROI arrays for fast what-if scenarios.
+
+    The benefits data is reduced once to (subtype x segment) matrices plus an
+    (employee x subtype) participation matrix. A scenario only rescales or
+    zeroes subtype rows of those matrices, so dropping or re-pricing a
+    benefit costs a few small array operations regardless of dataset size.
+    """
+
+    def __init__(self, df, benefit_costs, segments=None):
+        """
+        df:            cleaned benefits data (one row per employee and benefit)
+        benefit_costs: data/benefit_cost.csv with the 5-year rise per BenefitType
+        segments:      optional Series mapping EmployeeID -> employee_segment
+        """
+        pairs = df[['BenefitType', 'BenefitSubType']].drop_duplicates().sort_values(
+            ['BenefitType', 'BenefitSubType'])
+        self.subtypes = pairs['BenefitSubType'].to_numpy()
+        self.types = np.array(sorted(pairs['BenefitType'].unique()))
+        self.type_of_subtype = np.searchsorted(self.types, pairs['BenefitType'].to_numpy())
+        # (subtype x type) membership, used to roll subtype arrays up to types
+        self.type_matrix = np.eye(len(self.types), dtype=float)[self.type_of_subtype]
+
+        subtype_codes = pd.Categorical(df['BenefitSubType'], categories=self.subtypes).codes.astype(np.int64)
+        employee_ids, employee_codes = np.unique(df['EmployeeID'].to_numpy(), return_inverse=True)
+
+        if segments is None:
+            employee_segments = np.zeros(len(employee_ids), dtype=int)
+        else:
+            employee_segments = segments.reindex(employee_ids).fillna(-1).astype(int).to_numpy()
+        self.segments, self.employee_segment_codes = np.unique(employee_segments, return_inverse=True)
+        segment_codes = self.employee_segment_codes[employee_codes]
+
+        n_subtypes, n_segments = len(self.subtypes), len(self.segments)
+        cell = subtype_codes * n_segments + segment_codes
+        usage = df['UsageFrequency'].to_numpy(dtype=float)
+        satisfaction = df['SatisfactionScore'].to_numpy(dtype=float)
+
+        def cell_sum(weights=None):
+            sums = np.bincount(cell, weights=weights, minlength=n_subtypes * n_segments)
+            return sums.reshape(n_subtypes, n_segments).astype(float)
+
+        self.cost = cell_sum(df['BenefitCost'].to_numpy(dtype=float))
+        self.usage = cell_sum(usage)
+        self.satisfaction = cell_sum(satisfaction)
+        self.value = cell_sum(usage * satisfaction)
+        self.rows = cell_sum()
+
+        # (employee x subtype) participation
+        participation = np.bincount(employee_codes * n_subtypes + subtype_codes,
+                                    minlength=len(employee_ids) * n_subtypes)
+        self.participation = participation.reshape(len(employee_ids), n_subtypes) > 0
+
+        rates = annual_growth_rates(benefit_costs).reindex(self.types).fillna(0)
+        self.type_growth = rates.to_numpy(dtype=float)
+
+    def _subtype_multipliers(self, dropped=(), price_factors=None):
+        active = ~np.isin(self.subtypes, list(dropped)) & ~np.isin(
+            self.types[self.type_of_subtype], list(dropped))
+        factors = np.ones(len(self.subtypes))
+        for name, factor in (price_factors or {}).items():
+            factors[self.subtypes == name] = factor
+            factors[self.types[self.type_of_subtype] == name] = factor
+        return active, factors
+
+    def _level_table(self, index, name, spend, projected, usage, satisfaction, value, rows,
+                     participants):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table = pd.DataFrame({
+                'spend': spend,
+                'projected_spend': projected,
+                'cost_growth': projected - spend,
+                'participants': participants.astype(int),
+                'cost_per_participant': np.where(participants > 0, spend / participants, np.nan),
+                'avg_usage': np.where(rows > 0, usage / rows, np.nan),
+                'avg_satisfaction': np.where(rows > 0, satisfaction / rows, np.nan),
+                'roi': usage_weighted_roi(value, spend),
+            }, index=pd.Index(index, name=name))
+        return table
+
+    def scenario(self, dropped=(), price_factors=None, years=RISE_PERIOD_YEARS):
+        """Spend, participation, ROI and projected cost for one what-if scenario.
+
+        dropped:       benefit subtypes or types removed from the program
+        price_factors: {subtype or type: cost multiplier}, e.g. {'Gym Membership': 0.9}
+        years:         projection horizon for the per-type cost growth
+
+        Returns a dict with one DataFrame per level ('BenefitType',
+        'BenefitSubType', 'employee_segment') and a 'totals' dict.
+        """
+        active, factors = self._subtype_multipliers(dropped, price_factors)
+        keep = active.astype(float)[:, None]
+
+        cost = self.cost * (keep * factors[:, None])
+        growth = (1 + self.type_growth[self.type_of_subtype]) ** years
+        projected = cost * growth[:, None]
+        usage, satisfaction = self.usage * keep, self.satisfaction * keep
+        value, rows = self.value * keep, self.rows * keep
+
+        participation = self.participation & active
+        by_type = (participation.astype(float) @ self.type_matrix) > 0
+        enrolled = participation.any(axis=1)
+
+        result = {
+            'BenefitSubType': self._level_table(
+                self.subtypes, 'BenefitSubType', cost.sum(1), projected.sum(1), usage.sum(1),
+                satisfaction.sum(1), value.sum(1), rows.sum(1), participation.sum(0)),
+            'BenefitType': self._level_table(
+                self.types, 'BenefitType', *(m.sum(1) @ self.type_matrix for m in
+                                             (cost, projected, usage, satisfaction, value, rows)),
+                by_type.sum(0)),
+            'employee_segment': self._level_table(
+                self.segments, 'employee_segment', cost.sum(0), projected.sum(0), usage.sum(0),
+                satisfaction.sum(0), value.sum(0), rows.sum(0),
+                np.bincount(self.employee_segment_codes, weights=enrolled,
+                            minlength=len(self.segments))),
+        }
+
+        spend, projected_spend = cost.sum(), projected.sum()
+        totals = {
+            'spend': float(spend),
+            'projected_spend': float(projected_spend),
+            'cost_growth': float(projected_spend - spend),
+            'participants': int(enrolled.sum()),
+            'roi': float(usage_weighted_roi(value.sum(), spend)),
+            'years': years,
+            # Compared with the current program over the same horizon
+            'savings': float(self.cost.sum() - spend),
+            'projected_savings': float((self.cost * growth[:, None]).sum() - projected_spend),
+        }
+        result['totals'] = totals
+        return result
@@ -0,0 +1,243 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Validation rules from data_foundation.ipynb (section 1.4)
+RANGE_RULES = [
+    # (column, min, max, integer_only)
+    ('UsageFrequency', 0, None, False),
+    ('SatisfactionScore', 1, 5, True),
+    ('Age', 18, None, False),
+]
+# Date rules only warn: they are not part of the validation gate.
+# An end of None means "not in the future".
+DATE_RULES = [
+    # (column, start, end)
+    ('LastUsedDate', '2023-01-01', None),
+]
+UNIQUE_KEYS = [
+    ('EmployeeID', 'BenefitID'),
+]
+
+IQR_FACTOR = 1.5
+
+
+class DataValidationError(ValueError):
+    """Raised when a dataset breaks one or more validation rules"""
+
+    def __init__(self, report):
+        failed = [rule['rule'] for rule in report['rules'] if rule['fatal'] and not rule['passed']]
+        super().__init__(f"Data validation failed: {', '.join(failed)}")
+        self.report = report
+
+
+def _to_python(value):
+    """Convert numpy scalars so the report serializes to JSON"""
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, (np.bool_,)):
+        return bool(value)
+    return value
+
+
+class DatasetProfiler:
+    """Column statistics and rule checks accumulated over one or more chunks.
+
+    Each chunk is scanned once: numeric columns are reduced to merged value
+    counts, from which min/max/mean/std, all quantiles and IQR outlier counts
+    are derived exactly. Memory grows with the number of distinct values,
+    not with the number of rows, except for the uniqueness keys.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.dtypes = {}
+        self.nulls = {}
+        self.value_counts = {}
+        self.top_values = {}
+        self.violations = {}
+        self.warning_rules = set()
+        self.keys = {key: [] for key in UNIQUE_KEYS}
+        # Fixed once so every chunk is checked against the same day
+        self.today = pd.Timestamp.today().normalize()
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for column, dtype in chunk.dtypes.items():
+            self.dtypes.setdefault(column, str(dtype))
+
+        nulls = chunk.isna().sum()
+        for column, count in nulls.items():
+            self.nulls[column] = self.nulls.get(column, 0) + int(count)
+
+        for column in chunk.select_dtypes(include=[np.number]).columns:
+            counts = chunk[column].value_counts(dropna=True)
+            previous = self.value_counts.get(column)
+            self.value_counts[column] = counts if previous is None else previous.add(counts, fill_value=0)
+
+        for column in chunk.select_dtypes(include=['object', 'string', 'category']).columns:
+            counts = chunk[column].value_counts(dropna=False)
+            previous = self.top_values.get(column)
+            self.top_values[column] = counts if previous is None else previous.add(counts, fill_value=0)
+
+        self._check_rules(chunk)
+        return self
+
+    def _count(self, rule, violations):
+        self.violations[rule] = self.violations.get(rule, 0) + int(violations)
+
+    def _check_rules(self, chunk):
+        for column, low, high, integer_only in RANGE_RULES:
+            if column not in chunk.columns:
+                continue
+            values = pd.to_numeric(chunk[column], errors='coerce')
+            # Nulls and non-numeric values fail the rule: NaN compares False
+            # against both bounds and would otherwise pass
+            bad = values.isna()
+            if low is not None:
+                bad |= values < low
+            if high is not None:
+                bad |= values > high
+            if integer_only:
+                bad |= values.notna() & (values % 1 != 0)
+            self._count(self._range_name(column, low, high, integer_only), bad.sum())
+
+        for column, start, end in DATE_RULES:
+            if column not in chunk.columns:
+                continue
+            dates = pd.to_datetime(chunk[column], errors='coerce')
+            bad = dates.isna() | (dates < start) | (dates > (end or self.today))
+            rule = f"{column} between {start} and {end or 'today'}"
+            self.warning_rules.add(rule)
+            self._count(rule, bad.sum())
+
+        for key in UNIQUE_KEYS:
+            if set(key) <= set(chunk.columns):
+                # Null keys are violations of their own; casting them to int64
+                # would turn them into arbitrary ids
+                keys = chunk[list(key)]
+                missing = keys.isna().any(axis=1)
+                self._count(f"{', '.join(key)} not null", missing.sum())
+                self.keys[key].append(keys[~missing].to_numpy(dtype=np.int64))
+
+    @staticmethod
+    def _range_name(column, low, high, integer_only):
+        kind = 'integer' if integer_only else 'value'
+        if high is None:
+            return f'{column} {kind} >= {low}'
+        return f'{column} {kind} in {low}..{high}'
+
+    def _numeric_stats(self, counts):
+        counts = counts.sort_index()
+        values = counts.index.to_numpy(dtype=float)
+        weights = counts.to_numpy(dtype=float)
+        total = weights.sum()
+        if total == 0:
+            return {'count': 0}
+
+        # All quantiles in one lookup on the cumulative distribution
+        # (linear interpolation, matching pandas' default)
+        cumulative = np.cumsum(weights)
+        probabilities = np.array([0.25, 0.5, 0.75])
+        positions = probabilities * (total - 1)
+        lower_idx = np.searchsorted(cumulative, np.floor(positions) + 1)
+        upper_idx = np.searchsorted(cumulative, np.ceil(positions) + 1)
+        fraction = positions - np.floor(positions)
+        q1, median, q3 = values[lower_idx] + (values[upper_idx] - values[lower_idx]) * fraction
+
+        mean = np.dot(values, weights) / total
+        variance = np.dot((values - mean) ** 2, weights) / (total - 1) if total > 1 else np.nan
+        iqr = q3 - q1
+        lower_bound = q1 - IQR_FACTOR * iqr
+        upper_bound = q3 + IQR_FACTOR * iqr
+        outliers = weights[(values < lower_bound) | (values > upper_bound)].sum()
+
+        return {
+            'count': total, 'mean': mean, 'std': np.sqrt(variance),
+            'min': values[0], '25%': q1, '50%': median, '75%': q3, 'max': values[-1],
+            'iqr_lower': lower_bound, 'iqr_upper': upper_bound, 'outliers': outliers,
+            'unique': len(values),
+        }
+
+    def report(self):
+        """Machine-readable profile and rule results"""
+        columns = {}
+        for column, dtype in self.dtypes.items():
+            stats = {'dtype': dtype, 'nulls': self.nulls.get(column, 0)}
+            if column in self.value_counts:
+                stats.update(self._numeric_stats(self.value_counts[column]))
+            elif column in self.top_values:
+                counts = self.top_values[column]
+                # Ties broken by label so chunked and full runs agree
+                top = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:10]
+                stats['unique'] = len(counts)
+                stats['top'] = {str(k): int(v) for k, v in top}
+            columns[column] = {k: _to_python(v) for k, v in stats.items()}
+
+        violations = dict(self.violations)
+        for key, arrays in self.keys.items():
+            if not arrays:
+                continue
+            pairs = np.concatenate(arrays)
+            violations[f"unique ({', '.join(key)})"] = len(pairs) - len(np.unique(pairs, axis=0))
+
+        rules = [
+            {'rule': rule, 'violations': int(count), 'passed': count == 0,
+             'fatal': rule not in self.warning_rules}
+            for rule, count in violations.items()
+        ]
+        return {
+            'rows': self.rows,
+            'columns': columns,
+            'rules': rules,
+            'passed': all(rule['passed'] for rule in rules if rule['fatal']),
+        }
+
+
+def profile_dataset(data):
+    """Profile a DataFrame or an iterable of DataFrame chunks"""
+    profiler = DatasetProfiler()
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.report()
+
+
+def validate_dataset(data):
+    """Profile the data and raise DataValidationError if any rule fails"""
+    report = profile_dataset(data)
+    if not report['passed']:
+        raise DataValidationError(report)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile and validate a benefits CSV")
+    parser.add_argument('path', help="CSV file to validate, e.g. data/cleaned_data.csv")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream the file in chunks of this many rows")
+    parser.add_argument('--report', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.chunksize:
+        data = pd.read_csv(args.path, chunksize=args.chunksize)
+    else:
+        data = pd.read_csv(args.path)
+    report = profile_dataset(data)
+
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(structured, data_version):
+    """Hashable cache key for a structured query against one dataset version.
+
+    Filter and value order do not change the answer, so they are sorted;
+    group-by order does (it decides the chart axes) and is kept.
+    """
+    filters = tuple(sorted(
+        (column, tuple(sorted(values))) for column, values in structured['filters'].items()
+    ))
+    return (
+        structured['metric'],
+        filters,
+        tuple(structured['group_by']),
+        structured['order'],
+        data_version,
+    )
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache of query results with a time-to-live.
+
+    One instance is shared by every Streamlit session, so a question asked
+    by one HR user is answered from memory for the next.
+    """
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result for key, computing and storing it on a miss"""
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,260 @@
+import re
+
+# Metric keywords -> metric name understood by analytics.execute_query
+METRIC_ALIASES = {
+    'spend': 'spend', 'spent': 'spend', 'spending': 'spend', 'cost': 'spend',
+    'costs': 'spend', 'how much': 'spend', 'budget': 'spend',
+    'satisfaction': 'satisfaction', 'satisfied': 'satisfaction',
+    'satisfaction score': 'satisfaction', 'satisfaction scores': 'satisfaction',
+    'usage': 'usage', 'utilization': 'usage', 'utilisation': 'usage',
+    'used': 'usage', 'use': 'usage', 'uses': 'usage', 'using': 'usage',
+    'roi': 'roi', 'roi proxy': 'roi', 'return on investment': 'roi',
+    # Not bare 'employees': 'what do IT employees spend' asks about spend
+    'headcount': 'employees', 'how many': 'employees', 'number of employees': 'employees',
+    'cost per employee': 'per_employee', 'per employee': 'per_employee',
+}
+
+# Words naming a dimension that can be grouped on
+DIMENSION_ALIASES = {
+    'Department': ['department', 'departments', 'dept', 'depts', 'team', 'teams'],
+    'BenefitType': ['benefit', 'benefits', 'benefit type', 'benefit types', 'plan', 'plans'],
+    'BenefitSubType': ['subtype', 'subtypes', 'sub-type', 'sub-types',
+                       'benefit subtype', 'benefit subtypes'],
+    'age_group': ['age', 'age group', 'age groups', 'generation', 'generations'],
+    'tenure_group': ['tenure', 'tenure group', 'tenure groups'],
+    'Gender': ['gender', 'genders'],
+    'month': ['month', 'months'],
+}
+
+# Words that turn the next dimension word into a group-by
+GROUP_MARKERS = ['by', 'per', 'across', 'each', 'which', 'compare', 'breakdown of']
+
+# Words that continue a group-by list ('by department and gender')
+CONJUNCTIONS = ['and', ',']
+
+# Words that imply a monthly time series on their own
+TREND_WORDS = ['trend', 'trends', 'over time', 'monthly']
+
+# Metrics that replace a more generic one mentioned earlier ('spend per employee')
+METRIC_REFINEMENTS = {
+    'per_employee': {'spend', 'employees'},
+}
+
+ORDER_ALIASES = {
+    'highest': 'desc', 'top': 'desc', 'best': 'desc', 'most': 'desc', 'largest': 'desc',
+    'lowest': 'asc', 'bottom': 'asc', 'worst': 'asc', 'least': 'asc', 'smallest': 'asc',
+}
+
+# Categorical columns whose values become filter vocabulary
+FILTER_COLUMNS = ['Department', 'BenefitType', 'BenefitSubType', 'age_group',
+                  'tenure_group', 'Gender']
+
+# Tenure labels such as 'New (0-2 years)' are too generic on their own
+TENURE_SUFFIXES = ['tenure', 'hires', 'employees', 'staff']
+
+# Labels that are also everyday words only match as written ('IT', not 'it')
+CASE_SENSITIVE_WORDS = {'it', 'its'}
+
+# Subtype words too vague to stand for a subtype on their own
+GENERIC_WORDS = {'care', 'amount', 'on-site', 'high', 'basic', 'standard', 'tier'}
+
+
+def _normalize(text):
+    """Lowercase and collapse whitespace so aliases and matches compare equal"""
+    return ' '.join(text.lower().split())
+
+
+def _is_acronym(label):
+    """All-caps labels such as 'IT' or 'HR'"""
+    return label.isalpha() and label.isupper()
+
+
+def _label_aliases(label):
+    """Spoken variants of a category label: full, without parenthetical, singular/plural.
+
+    Acronyms get no plural ('hrs'). Those that are also everyday words keep
+    their case, so the pronoun 'it' never selects the IT department.
+    """
+    if _is_acronym(label):
+        return {label if label.lower() in CASE_SENSITIVE_WORDS else label.lower()}
+    full = _normalize(label)
+    short = _normalize(re.sub(r'\(.*?\)', '', full))
+    aliases = {full}
+    for base in {full, short}:
+        if not base:
+            continue
+        aliases.add(base)
+        if base[-1].isalpha():
+            aliases.add(base[:-1] if base.endswith('s') else base + 's')
+    return aliases
+
+
+def build_vocabulary(df):
+    """Map every recognized phrase to a (kind, column, value) token.
+
+    The value of a filter token is a single label, or a list of labels for
+    words that select several benefit subtypes at once.
+
+    Category values are read from the loaded data, so new departments or
+    benefit subtypes are picked up without touching the parser. Phrases are
+    stored lowercased, except labels in CASE_SENSITIVE_WORDS, which keep their case.
+    """
+    vocab = {}
+
+    for phrase, metric in METRIC_ALIASES.items():
+        vocab[phrase] = ('metric', None, metric)
+    for column, phrases in DIMENSION_ALIASES.items():
+        for phrase in phrases:
+            vocab[phrase] = ('dimension', column, None)
+    for phrase in GROUP_MARKERS:
+        vocab[phrase] = ('marker', None, None)
+    for phrase in CONJUNCTIONS:
+        vocab[phrase] = ('conjunction', None, None)
+    for phrase in TREND_WORDS:
+        vocab[phrase] = ('trend', 'month', None)
+    for phrase, order in ORDER_ALIASES.items():
+        vocab[phrase] = ('order', None, order)
+
+    for column in FILTER_COLUMNS:
+        if column not in df.columns:
+            continue
+        for label in df[column].dropna().unique():
+            label = str(label)
+            aliases = _label_aliases(label)
+            if column == 'tenure_group':
+                short = _normalize(re.sub(r'\(.*?\)', '', label))
+                aliases = {_normalize(label)} | {f'{short} {s}' for s in TENURE_SUFFIXES}
+            elif _is_acronym(label) and column in DIMENSION_ALIASES:
+                # 'it team' / 'hr dept' are unambiguous in any case
+                aliases |= {f'{label.lower()} {word}' for word in DIMENSION_ALIASES[column]}
+            for alias in aliases:
+                vocab[alias] = ('filter', column, label)
+
+    # Short names for benefit types: a leading word shared by all subtypes
+    # ('401k' -> Retirement Plan) or the type's own first word ('gym'),
+    # skipped when the word could also mean another benefit type
+    if {'BenefitType', 'BenefitSubType'} <= set(df.columns):
+        pairs = df[['BenefitType', 'BenefitSubType']].dropna().drop_duplicates()
+        owners = {}
+        shorts = {}
+        for benefit_type, subtypes in pairs.groupby('BenefitType')['BenefitSubType']:
+            heads = {_normalize(s).split()[0] for s in subtypes}
+            candidates = {_normalize(benefit_type).split()[0]}
+            if len(subtypes) > 1 and len(heads) == 1:
+                candidates |= heads
+            for word in candidates | heads:
+                owners.setdefault(word, set()).add(benefit_type)
+            for word in candidates:
+                shorts[word] = benefit_type
+        for word, benefit_type in shorts.items():
+            if len(owners[word]) == 1 and word not in vocab:
+                vocab[word] = ('filter', 'BenefitType', benefit_type)
+
+        # Distinctive words inside subtype names ('matching', 'ppo') select
+        # every subtype containing them, provided they stay within one type
+        word_subtypes = {}
+        for benefit_type, subtype in pairs.itertuples(index=False):
+            for word in set(_normalize(subtype).split()):
+                word_subtypes.setdefault(word, []).append((benefit_type, subtype))
+        for word, matches in word_subtypes.items():
+            if (word in vocab or word in GENERIC_WORDS or len(word) < 3
+                    or len({benefit_type for benefit_type, _ in matches}) > 1):
+                continue
+            vocab[word] = ('filter', 'BenefitSubType', [subtype for _, subtype in matches])
+
+    return vocab
+
+
+def compile_matcher(vocab):
+    """Compile all phrases into a single alternation, longest phrases first.
+
+    Matching ignores case, except for phrases stored with capitals ('IT').
+    """
+    def alternative(phrase):
+        words = r'\s+'.join(re.escape(word) for word in phrase.split())
+        return words if phrase == phrase.lower() else f'(?-i:{words})'
+
+    phrases = sorted(vocab, key=len, reverse=True)
+    # Phrases that start and end with a word character share one pair of word
+    # boundaries; the rest ('<5', ',') carry their own where they need them
+    bounded = [phrase for phrase in phrases if re.match(r'\w', phrase) and re.search(r'\w$', phrase)]
+    others = []
+    for phrase in phrases:
+        if phrase in bounded:
+            continue
+        words = alternative(phrase)
+        if re.match(r'\w', phrase):
+            words = rf'(?<!\w){words}'
+        if re.search(r'\w$', phrase):
+            words = rf'{words}(?!\w)'
+        others.append(words)
+    pattern = '|'.join([rf"(?<!\w)(?:{'|'.join(map(alternative, bounded))})(?!\w)"] + others)
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class QueryParser:
+    """Turn free-text questions into structured queries in one regex pass.
+
+    The structured query is a plain dict:
+        {'metric': 'spend', 'filters': {'Department': ['Finance']},
+         'group_by': ['BenefitType'], 'order': 'desc'}
+    or None when nothing in the text was recognized.
+    """
+
+    def __init__(self, df):
+        self.vocab = build_vocabulary(df)
+        self.matcher = compile_matcher(self.vocab)
+
+    def tokenize(self, query):
+        """Return the recognized tokens of a query in order"""
+        tokens = []
+        for match in self.matcher.finditer(query):
+            phrase = ' '.join(match.group(0).split())
+            tokens.append(self.vocab.get(phrase) or self.vocab[phrase.lower()])
+        return tokens
+
+    def parse(self, query):
+        metric = None
+        filters = {}
+        group_by = []
+        order = None
+        trend = False
+        grouping = False
+
+        for kind, column, value in self.tokenize(query):
+            if kind == 'conjunction':
+                # 'and' / ',' keep a group-by list open: 'by department and gender'
+                continue
+            if kind == 'metric':
+                if metric is None or metric in METRIC_REFINEMENTS.get(value, ()):
+                    metric = value
+            elif kind == 'filter':
+                values = filters.setdefault(column, [])
+                for item in value if isinstance(value, list) else [value]:
+                    if item not in values:
+                        values.append(item)
+            elif kind == 'dimension' and grouping and column not in group_by:
+                group_by.append(column)
+            elif kind == 'trend':
+                trend = True
+            elif kind == 'order':
+                order = value
+            grouping = kind == 'marker' or (kind == 'dimension' and grouping)
+
+        if metric is None and not filters and not group_by and not trend:
+            return None
+
+        # Several values for one column only make sense side by side
+        for column, values in filters.items():
+            if len(values) > 1 and column not in group_by:
+                group_by.insert(0, column)
+        # Time always goes last so trends read as one series per group
+        if trend or 'month' in group_by:
+            group_by = [column for column in group_by if column != 'month'][:1] + ['month']
+
+        return {
+            'metric': metric or 'spend',
+            'filters': filters,
+            'group_by': group_by[:2],
+            'order': order,
+        }
@@ -0,0 +1,141 @@
+import os
+
+import pandas as pd
+
+# File names of the normalized segment tables inside data/
+ASSIGNMENTS_FILE = 'segment_assignments.csv'        # EmployeeID -> employee_segment
+SEGMENT_BENEFITS_FILE = 'segment_benefits.csv'      # employee_segment -> top/bot/seg_rec benefits
+EMPLOYEE_RECS_FILE = 'employee_recommendations.csv'  # EmployeeID -> personal rec benefits
+
+# Benefit list kinds stored per segment, in display order
+SEGMENT_KINDS = ['top', 'bot', 'seg_rec']
+
+
+def _benefit_ids(benefits, names):
+    """Map benefit subtype names to BenefitIDs, failing loudly on unknown names"""
+    lookup = pd.Series(benefits['BenefitID'].values, index=benefits['BenefitSubType'])
+    ids = pd.Series(names, dtype='object').map(lookup)
+    unknown = sorted(set(pd.Series(names)[ids.isna().values]))
+    if unknown:
+        raise ValueError(f"Unknown benefit subtypes: {unknown}")
+    return ids.astype('int32').values
+
+
+def build_segment_store(assignments, segment_benefits, employee_recs, benefits):
+    """Build the three normalized segment tables.
+
+    assignments:      DataFrame with EmployeeID and employee_segment
+    segment_benefits: {'top' | 'bot' | 'seg_rec': {segment_id: [subtype names]}}
+    employee_recs:    {EmployeeID: [subtype names]}
+    benefits:         benefits_data.csv, used to turn subtype names into BenefitIDs
+    """
+    assignment_table = (
+        assignments[['EmployeeID', 'employee_segment']]
+        .drop_duplicates(subset=['EmployeeID'], keep='first')
+        .astype('int32')
+        .sort_values('EmployeeID')
+        .reset_index(drop=True)
+    )
+
+    rows = [
+        (segment, kind, rank, name)
+        for kind in SEGMENT_KINDS
+        for segment, names in segment_benefits.get(kind, {}).items()
+        for rank, name in enumerate(names, 1)
+        if pd.notna(name) and str(name).strip() != ''
+    ]
+    segment_table = pd.DataFrame(rows, columns=['employee_segment', 'kind', 'rank', 'BenefitSubType'])
+    segment_table['BenefitID'] = _benefit_ids(benefits, segment_table['BenefitSubType'])
+    segment_table = segment_table.drop(columns='BenefitSubType').astype(
+        {'employee_segment': 'int32', 'rank': 'int8'})
+
+    rows = [
+        (employee_id, rank, name)
+        for employee_id, names in employee_recs.items()
+        for rank, name in enumerate(names, 1)
+        if pd.notna(name)
+    ]
+    recs_table = pd.DataFrame(rows, columns=['EmployeeID', 'rank', 'BenefitSubType'])
+    recs_table['BenefitID'] = _benefit_ids(benefits, recs_table['BenefitSubType'])
+    recs_table = (
+        recs_table.drop(columns='BenefitSubType')
+        .astype({'EmployeeID': 'int32', 'rank': 'int8'})
+        .sort_values(['EmployeeID', 'rank'])
+        .reset_index(drop=True)
+    )
+
+    return {
+        'assignments': assignment_table,
+        'segment_benefits': segment_table,
+        'employee_recs': recs_table,
+    }
+
+
+def save_segment_store(store, data_dir='data'):
+    """Write the segment tables, replacing any previous clustering output"""
+    store['assignments'].to_csv(os.path.join(data_dir, ASSIGNMENTS_FILE), index=False)
+    store['segment_benefits'].to_csv(os.path.join(data_dir, SEGMENT_BENEFITS_FILE), index=False)
+    store['employee_recs'].to_csv(os.path.join(data_dir, EMPLOYEE_RECS_FILE), index=False)
+
+
+def load_segment_store(data_dir='data'):
+    """Load the segment tables with compact integer dtypes"""
+    return {
+        'assignments': pd.read_csv(
+            os.path.join(data_dir, ASSIGNMENTS_FILE),
+            dtype={'EmployeeID': 'int32', 'employee_segment': 'int32'}),
+        'segment_benefits': pd.read_csv(
+            os.path.join(data_dir, SEGMENT_BENEFITS_FILE),
+            dtype={'employee_segment': 'int32', 'kind': 'category', 'rank': 'int8',
+                   'BenefitID': 'int32'}),
+        'employee_recs': pd.read_csv(
+            os.path.join(data_dir, EMPLOYEE_RECS_FILE),
+            dtype={'EmployeeID': 'int32', 'rank': 'int8', 'BenefitID': 'int32'}),
+    }
+
+
+def segment_profile(store, benefits, segment):
+    """Top, bottom and recommended benefit subtypes of one segment"""
+    names = benefits.set_index('BenefitID')['BenefitSubType']
+    table = store['segment_benefits']
+    rows = table[table['employee_segment'] == segment].sort_values('rank')
+    return {
+        kind: rows.loc[rows['kind'] == kind, 'BenefitID'].map(names).tolist()
+        for kind in SEGMENT_KINDS
+    }
+
+
+def employee_recommendations(store, benefits, employee_id):
+    """Personal benefit recommendations for one employee, best first"""
+    names = benefits.set_index('BenefitID')['BenefitSubType']
+    table = store['employee_recs']
+    rows = table[table['EmployeeID'] == employee_id].sort_values('rank')
+    return rows['BenefitID'].map(names).tolist()
+
+
+def persona_segments(df, store, persona_cols=('Department', 'age_group', 'tenure_group')):
+    """Most common segment for every persona (department, age group, tenure group)"""
+    persona_cols = list(persona_cols)
+    employees = df[['EmployeeID'] + persona_cols].drop_duplicates(subset=['EmployeeID'])
+    joined = employees.merge(store['assignments'], on='EmployeeID', how='inner')
+    counts = joined.groupby(persona_cols + ['employee_segment'], observed=True).size()
+    counts = counts.reset_index(name='employees').sort_values(
+        ['employees', 'employee_segment'], ascending=[False, True])
+    return counts.drop_duplicates(subset=persona_cols).set_index(persona_cols)['employee_segment']
+
+
+def segment_table_wide(store, benefits):
+    """One row per segment with top1..3, bot1..3 and seg_rec1..3 subtype names"""
+    names = benefits.set_index('BenefitID')['BenefitSubType']
+    table = store['segment_benefits'].assign(
+        column=lambda t: t['kind'].astype(str) + t['rank'].astype(str),
+        BenefitSubType=lambda t: t['BenefitID'].map(names))
+    wide = table.pivot(index='employee_segment', columns='column', values='BenefitSubType')
+    columns = [f'{kind}{rank}' for kind in SEGMENT_KINDS for rank in (1, 2, 3)]
+    return wide.reindex(columns=columns)
+
+
+def persona_recommendations(df, store, benefits):
+    """Segment and its top/bottom/recommended benefits for every persona"""
+    personas = persona_segments(df, store).reset_index()
+    return personas.join(segment_table_wide(store, benefits), on='employee_segment')
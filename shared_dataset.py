@@ -0,0 +1,51 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def export_dataset(df, directory):
+    """Write a DataFrame as one .npy file per column for memory-mapped reads.
+
+    Numeric and boolean columns are stored as-is; text columns are stored as
+    int32 category codes with their categories in the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'rows': len(df), 'columns': []}
+    for i, (column, values) in enumerate(df.items()):
+        file_name = f'col{i}.npy'
+        entry = {'name': column, 'file': file_name}
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            array = values.to_numpy()
+        else:
+            categorical = pd.Categorical(values)
+            array = categorical.codes.astype(np.int32)
+            entry['categories'] = [str(c) for c in categorical.categories]
+        np.save(os.path.join(directory, file_name), array)
+        manifest['columns'].append(entry)
+
+    with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f)
+    return directory
+
+
+def open_dataset(directory):
+    """Open an exported dataset with every column memory-mapped read-only.
+
+    Worker processes opening the same directory share the pages through the
+    OS page cache instead of each parsing and holding its own copy.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    columns = {}
+    for entry in manifest['columns']:
+        array = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+        if 'categories' in entry:
+            columns[entry['name']] = pd.Categorical.from_codes(array, entry['categories'])
+        else:
+            columns[entry['name']] = array
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from query_parser import QueryParser
+
+
+@pytest.fixture(scope='module')
+def parser():
+    benefits = [
+        ('Retirement Plan', '401k Basic Matching'),
+        ('Retirement Plan', '401k Standard Matching'),
+        ('Retirement Plan', '401k Catch-Up Contributions'),
+        ('Childcare', 'After-School Care'),
+        ('Health Insurance', 'PPO Family'),
+        ('Health Insurance', 'HMO Family'),
+        ('Gym Membership', 'Family Membership'),
+    ]
+    departments = ['Finance', 'HR', 'IT', 'Marketing', 'Sales']
+    rows = [
+        {
+            'Department': departments[i % len(departments)],
+            'BenefitType': benefit_type,
+            'BenefitSubType': subtype,
+            'age_group': ['Gen Z', 'Millennials', 'Gen X', 'Boomers'][i % 4],
+            'tenure_group': ['New (0-2 years)', 'Mid (3-7 years)', 'Senior (8+ years)'][i % 3],
+            'Gender': ['Female', 'Male', 'Non-Binary'][i % 3],
+        }
+        for i, (benefit_type, subtype) in enumerate(benefits * len(departments))
+    ]
+    return QueryParser(pd.DataFrame(rows))
+
+
+# Queries with the part of their parse that must not change
+PARSE_CHECKS = [
+    ('Is it worth spending on childcare?', {'filters': {'BenefitType': ['Childcare']}}),
+    ('What did it cost us?', {'filters': {}}),
+    ('How is its usage trending?', {'filters': {}}),
+    ('What was the spend for the IT team?', {'filters': {'Department': ['IT']}}),
+    ('spend in the it department', {'filters': {'Department': ['IT']}}),
+    ('roi for hr', {'filters': {'Department': ['HR']}}),
+    ('hr spend', {'filters': {'Department': ['HR']}}),
+    ('What was the ROI proxy for HR team benefits?', {'metric': 'roi', 'filters': {'Department': ['HR']}}),
+    ('usage by department and gender', {'group_by': ['Department', 'Gender']}),
+    ('usage by department, gender', {'group_by': ['Department', 'Gender']}),
+    ('spend per employee by department', {'metric': 'per_employee', 'group_by': ['Department']}),
+    ('per employee spend', {'metric': 'per_employee'}),
+    ('What do IT employees spend on health insurance?',
+     {'metric': 'spend', 'filters': {'Department': ['IT'], 'BenefitType': ['Health Insurance']}}),
+    ('Are Finance employees satisfied with their benefits?', {'metric': 'satisfaction'}),
+    ('Which benefits do Gen Z employees use most?',
+     {'metric': 'usage', 'group_by': ['BenefitType'], 'order': 'desc'}),
+    ('Which department uses gym the most?',
+     {'metric': 'usage', 'filters': {'BenefitType': ['Gym Membership']}, 'group_by': ['Department']}),
+    ('How many employees are in Sales?', {'metric': 'employees'}),
+    ('number of employees by gender', {'metric': 'employees', 'group_by': ['Gender']}),
+]
+
+
+@pytest.mark.parametrize('query, expected', PARSE_CHECKS)
+def test_parse(parser, query, expected):
+    structured = parser.parse(query)
+    assert structured is not None
+    for field, value in expected.items():
+        assert structured[field] == value
+
+
+def test_unrecognized_query(parser):
+    assert parser.parse('hello there') is None